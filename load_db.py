@@ -4,36 +4,156 @@ Orders Analytics - Database Loader
 This script creates an SQLite database and loads order data from CSV.
 """
 
-import sqlite3
 import csv
+import sqlite3
 import os
-from datetime import datetime
+import shutil
+import subprocess
+from datetime import date, datetime
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+import numba_csv
 
 def create_database():
-    """Create the orders database and table."""
+    """Create the orders database and configure the connection."""
     print("Creating orders.db database...")
     
-    # Connect to database (creates file if it doesn't exist)
-    conn = sqlite3.connect('orders.db')
+    # Connect to database (creates file if it doesn't exist).
+    # isolation_level=None turns off the implicit transactions so the
+    # bulk load below can manage its own BEGIN/COMMIT, and the larger
+    # statement cache keeps every statement's prepare cost to one parse.
+    conn = sqlite3.connect('orders.db', isolation_level=None,
+                           cached_statements=512)
     cursor = conn.cursor()
-    
-    # Create orders table
+
+    # Tune the connection for a bulk import: one fsync for the whole load
+    # instead of one per statement, and a larger in-memory page cache.
+    # The table is rebuilt from CSV on every run, so losing durability on
+    # a crash mid-load is acceptable.
+    cursor.executescript('''
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=OFF;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-200000;
+    ''')
+
+    print("✓ Database created successfully")
+    return conn
+
+def import_csv_with_cli(conn, csv_file):
+    """Import the CSV through the sqlite3 shell, casting types inside SQL.
+
+    The shell's .import reads and binds rows entirely in C, well ahead of
+    anything we can do from Python. Returns the number of rows imported,
+    or None if the sqlite3 binary is not available so the caller can fall
+    back to the Python loader.
+    """
+    if shutil.which('sqlite3') is None:
+        return None
+
+    cursor = conn.cursor()
+    cursor.execute('DROP TABLE IF EXISTS orders_stage')
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            order_id TEXT PRIMARY KEY,
-            order_date DATE,
+        CREATE TABLE orders_stage (
+            order_id TEXT,
+            order_date TEXT,
             customer_id TEXT,
             product TEXT,
             category TEXT,
-            unit_price REAL,
-            quantity INTEGER,
+            unit_price TEXT,
+            quantity TEXT,
             country TEXT
         )
     ''')
-    
-    conn.commit()
-    print("✓ Database and table created successfully")
-    return conn
+
+    result = subprocess.run(
+        ['sqlite3', 'orders.db',
+         '-cmd', '.mode csv',
+         f'.import --skip 1 {csv_file} orders_stage'],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(f"⚠️  sqlite3 .import failed ({result.stderr.strip()}), "
+              "falling back to Python loader")
+        cursor.execute('DROP TABLE orders_stage')
+        return None
+
+    # Cast and move inside SQLite so no row ever surfaces into Python.
+    # julianday - 1721424.5 converts an ISO date to its toordinal() day.
+    cursor.execute('''
+        INSERT INTO orders (order_id, order_date, customer_id, product,
+                          category, unit_price, quantity, country)
+        SELECT order_id,
+               CAST(julianday(order_date) - 1721424.5 AS INTEGER),
+               customer_id, product, category,
+               CAST(unit_price AS REAL), CAST(quantity AS INTEGER), country
+        FROM orders_stage
+    ''')
+    rows_inserted = cursor.rowcount
+    cursor.execute('DROP TABLE orders_stage')
+    return rows_inserted
+
+def parse_csv_with_numba(csv_file):
+    """Parse the CSV with the jit kernels in numba_csv.
+
+    The numeric columns never surface as Python objects: the file is read
+    as raw bytes, field offsets come from a compiled byte scan, and
+    order_date/unit_price/quantity are walked digit-by-digit straight
+    into numpy arrays. Returns None for quoted CSVs, which the byte scanner cannot
+    split, so the caller can fall back to a csv-aware parser.
+    """
+    buf = np.fromfile(csv_file, dtype=np.uint8)
+    if (buf == ord('"')).any():
+        return None
+
+    starts, ends = numba_csv.scan_fields(buf, 8)
+    data = buf.tobytes()
+    header = [data[starts[0, c]:ends[0, c]].decode('utf-8') for c in range(8)]
+    columns = {name: c for c, name in enumerate(header)}
+    starts, ends = starts[1:], ends[1:]
+
+    def text_column(name):
+        c = columns[name]
+        return [data[starts[r, c]:ends[r, c]].decode('utf-8')
+                for r in range(len(starts))]
+
+    def numeric_column(name, parse):
+        c = columns[name]
+        return parse(buf, starts[:, c].copy(), ends[:, c].copy())
+
+    return pd.DataFrame({
+        'order_id': text_column('order_id'),
+        'order_date': numeric_column('order_date', numba_csv.parse_date_column),
+        'customer_id': text_column('customer_id'),
+        'product': text_column('product'),
+        'category': text_column('category'),
+        'unit_price': numeric_column('unit_price', numba_csv.parse_float_column),
+        'quantity': numeric_column('quantity', numba_csv.parse_int_column),
+        'country': text_column('country')
+    })
+
+def iter_csv_rows(csv_file):
+    """Yield typed row tuples for CSVs the byte scanner cannot handle.
+
+    Uses plain csv.reader with integer indexing — resolving each column
+    position from the header once — rather than DictReader, which builds
+    a dict per row just to look fields up by name.
+    """
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        i_id, i_date, i_cust, i_prod, i_cat, i_price, i_qty, i_country = (
+            header.index(column) for column in (
+                'order_id', 'order_date', 'customer_id', 'product',
+                'category', 'unit_price', 'quantity', 'country'))
+        for row in reader:
+            yield (row[i_id],
+                   datetime.strptime(row[i_date], '%Y-%m-%d').toordinal(),
+                   row[i_cust], row[i_prod], row[i_cat],
+                   float(row[i_price]), int(row[i_qty]), row[i_country])
 
 def load_csv_data(conn):
     """Load data from CSV file into the database."""
@@ -46,47 +166,146 @@ def load_csv_data(conn):
     print(f"Loading data from {csv_file}...")
     cursor = conn.cursor()
     
-    # Clear existing data
-    cursor.execute('DELETE FROM orders')
-    
-    # Load CSV data
-    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-        csv_reader = csv.DictReader(file)
-        rows_inserted = 0
-        
-        for row in csv_reader:
-            cursor.execute('''
-                INSERT INTO orders (order_id, order_date, customer_id, product, 
-                                  category, unit_price, quantity, country)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                row['order_id'],
-                row['order_date'],
-                row['customer_id'],
-                row['product'],
-                row['category'],
-                float(row['unit_price']),
-                int(row['quantity']),
-                row['country']
-            ))
-            rows_inserted += 1
-    
-    conn.commit()
+    # Dropping the table is an O(1) metadata operation, where DELETE FROM
+    # journals every page it clears. This also takes any indexes from a
+    # previous run with it, so the inserts below stay index-free, and it
+    # guarantees the freshest schema.
+    # order_id is left unconstrained so the bulk load doesn't maintain a
+    # unique index per INSERT; create_indexes() builds it in one pass
+    # after the data is in.
+    cursor.execute('DROP TABLE IF EXISTS orders')
+    cursor.execute('''
+        CREATE TABLE orders (
+            order_id TEXT,
+            order_date INTEGER,  -- date.toordinal() day number
+            customer_id TEXT,
+            product TEXT,
+            category TEXT,
+            unit_price REAL,
+            quantity INTEGER,
+            country TEXT,
+            revenue REAL GENERATED ALWAYS AS (unit_price * quantity) STORED
+        )
+    ''')
+
+    # Fast path: let the sqlite3 shell do the whole import in C
+    rows_inserted = import_csv_with_cli(conn, csv_file)
+
+    if rows_inserted is None:
+        # Parse the numeric columns with the numba kernels; quoted CSVs,
+        # which the byte scanner cannot split, stream through csv.reader
+        df = parse_csv_with_numba(csv_file)
+        if df is None:
+            rows = iter_csv_rows(csv_file)
+        else:
+            rows = df.itertuples(index=False, name=None)
+        # Bind the rows through Connection.executemany: one prepared
+        # statement and no pandas insert layer or intermediate cursor in
+        # the hot path, with the whole append in one explicit transaction
+        conn.execute('BEGIN IMMEDIATE')
+        result = conn.executemany('''
+            INSERT INTO orders (order_id, order_date, customer_id, product,
+                              category, unit_price, quantity, country)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        rows_inserted = result.rowcount
+        conn.execute('COMMIT')
     print(f"✓ Successfully loaded {rows_inserted} orders into database")
     return True
 
+def create_indexes(conn):
+    """Create indexes after the bulk load, in one sorted batch each."""
+    print("Creating indexes...")
+    cursor = conn.cursor()
+
+    # Rebuilding the unique index here is far cheaper than maintaining it
+    # row by row during the insert
+    cursor.execute('CREATE UNIQUE INDEX idx_orders_pk ON orders(order_id)')
+
+    # Covering indexes for the GROUP BY queries in queries.py: SQLite can
+    # stream each aggregate straight off the index pages, already in group
+    # order, without touching the main table
+    cursor.execute('''
+        CREATE INDEX idx_orders_date_rev
+        ON orders(order_date, revenue)
+    ''')
+    cursor.execute('''
+        CREATE INDEX idx_orders_category_rev
+        ON orders(category, revenue, quantity)
+    ''')
+    cursor.execute('''
+        CREATE INDEX idx_orders_product_rev
+        ON orders(product, category, revenue, quantity, unit_price)
+    ''')
+    cursor.execute('''
+        CREATE INDEX idx_orders_customer_rev
+        ON orders(customer_id, order_date, revenue, category)
+    ''')
+
+    print("✓ Indexes created successfully")
+
+# Repeat-customer aggregate, precomputed at load time so the report in
+# queries.py reads a table of repeat customers instead of re-aggregating
+# every customer on every run. Works unchanged on SQLite and DuckDB.
+CUSTOMER_STATS_SQL = '''
+    CREATE TABLE customer_stats AS
+    SELECT
+        customer_id,
+        COUNT(*) as order_count,
+        SUM(revenue) as total_spent,
+        AVG(revenue) as avg_order_value,
+        MIN(order_date) as first_order_date,
+        MAX(order_date) as last_order_date,
+        COUNT(DISTINCT category) as categories_purchased
+    FROM orders
+    GROUP BY customer_id
+    HAVING COUNT(*) > 1
+'''
+
+def build_customer_stats(conn):
+    """Materialize the repeat-customer aggregate in orders.db."""
+    print("Building customer_stats table...")
+    cursor = conn.cursor()
+    cursor.execute('DROP TABLE IF EXISTS customer_stats')
+    cursor.execute(CUSTOMER_STATS_SQL)
+    print("✓ customer_stats table built")
+
+def build_analytics_database():
+    """Build the DuckDB analytics database straight from the CSV.
+
+    The reports in queries.py are pure OLAP (full-table GROUP BY and
+    aggregates), which DuckDB's vectorized columnar engine runs far
+    faster than SQLite. orders.db stays around for row-oriented reads.
+    """
+    print("Building orders.duckdb for analytics...")
+
+    con = duckdb.connect('orders.duckdb')
+    # Match the orders.db schema: order_date as a toordinal() day number
+    # and revenue precomputed like the generated column there
+    con.execute('''
+        CREATE OR REPLACE TABLE orders AS
+        SELECT * REPLACE (
+                   date_diff('day', DATE '1970-01-01', order_date) + 719163
+                   AS order_date),
+               unit_price * quantity AS revenue
+        FROM read_csv_auto('data/orders.csv')
+    ''')
+    con.execute('DROP TABLE IF EXISTS customer_stats')
+    con.execute(CUSTOMER_STATS_SQL)
+    total = con.execute('SELECT COUNT(*) FROM orders').fetchone()[0]
+    con.close()
+
+    print(f"✓ Analytics database built ({total} orders)")
+
 def verify_data(conn):
     """Verify the loaded data."""
     cursor = conn.cursor()
     
-    # Count total records
-    cursor.execute('SELECT COUNT(*) FROM orders')
-    total_count = cursor.fetchone()[0]
-    
-    # Get date range
-    cursor.execute('SELECT MIN(order_date), MAX(order_date) FROM orders')
-    date_range = cursor.fetchone()
-    
+    # Record count and date range come from one scan instead of two
+    cursor.execute('SELECT COUNT(*), MIN(order_date), MAX(order_date) FROM orders')
+    total_count, date_min, date_max = cursor.fetchone()
+    date_range = (date.fromordinal(date_min), date.fromordinal(date_max))
+
     # Get category breakdown
     cursor.execute('SELECT category, COUNT(*) FROM orders GROUP BY category ORDER BY COUNT(*) DESC')
     categories = cursor.fetchall()
@@ -109,9 +328,12 @@ def main():
         
         # Load CSV data
         if load_csv_data(conn):
+            create_indexes(conn)
+            build_customer_stats(conn)
+            build_analytics_database()
             verify_data(conn)
             print("\n✅ Database setup completed successfully!")
-            print("   Database file: orders.db")
+            print("   Database files: orders.db, orders.duckdb")
             print("   Ready to run analytics with: python queries.py")
         else:
             print("\n❌ Database setup failed!")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Orders Analytics - Numba CSV kernels
+JIT-compiled helpers that parse CSV bytes into numpy arrays without
+creating a Python object per value. Only handles unquoted CSV; callers
+must fall back to a csv-aware parser when quoted fields are possible.
+"""
+
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def scan_fields(buf, n_cols):
+    """Byte-scan an unquoted CSV into per-field [start, end) offsets.
+
+    Returns two (n_rows, n_cols) int64 arrays of field boundaries,
+    header row included. CRLF line endings are handled.
+    """
+    n = buf.size
+    n_rows = 0
+    for i in range(n):
+        if buf[i] == 10:  # '\n'
+            n_rows += 1
+    if n > 0 and buf[n - 1] != 10:
+        n_rows += 1
+
+    starts = np.empty((n_rows, n_cols), dtype=np.int64)
+    ends = np.empty((n_rows, n_cols), dtype=np.int64)
+
+    row = 0
+    col = 0
+    field_start = 0
+    for i in range(n):
+        b = buf[i]
+        if b == 44:  # ','
+            starts[row, col] = field_start
+            ends[row, col] = i
+            col += 1
+            field_start = i + 1
+        elif b == 10:  # '\n'
+            end = i
+            if end > field_start and buf[end - 1] == 13:  # '\r'
+                end -= 1
+            starts[row, col] = field_start
+            ends[row, col] = end
+            row += 1
+            col = 0
+            field_start = i + 1
+    if field_start < n:
+        # final line without a trailing newline
+        starts[row, col] = field_start
+        ends[row, col] = n
+        row += 1
+
+    return starts[:row], ends[:row]
+
+@njit(cache=True)
+def parse_float_column(buf, starts, ends):
+    """Walk ASCII digits in each [start, end) range into a float64 array."""
+    out = np.empty(starts.size, dtype=np.float64)
+    for i in range(starts.size):
+        j = starts[i]
+        end = ends[i]
+        sign = 1.0
+        if j < end and buf[j] == 45:  # '-'
+            sign = -1.0
+            j += 1
+        # Accumulate an integer mantissa and divide once by the decimal
+        # scale; this rounds exactly like strtod, where adding fractional
+        # digits one by one would drift in the last bits
+        mantissa = 0
+        frac_digits = 0
+        while j < end and buf[j] != 46:  # '.'
+            mantissa = mantissa * 10 + (buf[j] - 48)
+            j += 1
+        if j < end and buf[j] == 46:
+            j += 1
+            while j < end:
+                mantissa = mantissa * 10 + (buf[j] - 48)
+                frac_digits += 1
+                j += 1
+        out[i] = sign * (mantissa / 10.0 ** frac_digits)
+    return out
+
+@njit(cache=True)
+def parse_date_column(buf, starts, ends):
+    """Parse ISO YYYY-MM-DD fields into date.toordinal() day numbers."""
+    out = np.empty(starts.size, dtype=np.int64)
+    for i in range(starts.size):
+        j = starts[i]
+        year = ((buf[j] - 48) * 1000 + (buf[j + 1] - 48) * 100
+                + (buf[j + 2] - 48) * 10 + (buf[j + 3] - 48))
+        month = (buf[j + 5] - 48) * 10 + (buf[j + 6] - 48)
+        day = (buf[j + 8] - 48) * 10 + (buf[j + 9] - 48)
+        # days-from-civil, shifted onto date.toordinal()'s epoch
+        y = year - 1 if month <= 2 else year
+        era = y // 400
+        yoe = y - era * 400
+        mp = month - 3 if month > 2 else month + 9
+        doy = (153 * mp + 2) // 5 + day - 1
+        doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+        out[i] = era * 146097 + doe - 305
+    return out
+
+@njit(cache=True)
+def parse_int_column(buf, starts, ends):
+    """Walk ASCII digits in each [start, end) range into an int64 array."""
+    out = np.empty(starts.size, dtype=np.int64)
+    for i in range(starts.size):
+        j = starts[i]
+        end = ends[i]
+        sign = 1
+        if j < end and buf[j] == 45:  # '-'
+            sign = -1
+            j += 1
+        value = 0
+        while j < end:
+            value = value * 10 + (buf[j] - 48)
+            j += 1
+        out[i] = sign * value
+    return out